@@ -16,7 +16,8 @@ from pathlib import Path
 import platform
 from typing import List, Dict, Any, Optional, Tuple, Union
 import time
-import tempfile
+import threading
+from functools import lru_cache
 
 # Locate the shared library
 def _find_lib():
@@ -76,58 +77,26 @@ _lib.embr_get_vector.argtypes = [ctypes.c_void_p, ctypes.c_uint64, ctypes.POINTE
 _lib.embr_get_vector.restype = ctypes.c_int
 
 
-# Define cmd_ function signatures correctly
-_lib.cmd_rollback.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_rollback.restype = ctypes.c_int
+# Bind cmd_ functions from one shared prototype: int cmd_x(int argc, char** argv)
+_CMD_PROTOTYPE = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_char_p))
 
-_lib.cmd_set.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_set.restype = ctypes.c_int
+for _cmd_name in (
+    "cmd_rollback", "cmd_set", "cmd_init", "cmd_model", "cmd_store",
+    "cmd_status", "cmd_log", "cmd_diff", "cmd_rm", "cmd_switch",
+    "cmd_config", "cmd_gc", "cmd_get", "cmd_merge", "cmd_pull",
+    "cmd_push", "cmd_remote",
+):
+    setattr(_lib, _cmd_name, _CMD_PROTOTYPE((_cmd_name, _lib)))
+del _cmd_name
 
-_lib.cmd_init.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_init.restype = ctypes.c_int
+@lru_cache(maxsize=16)
+def _argv_type(argc):
+    """Return the ctypes char* array type for argc arguments (cached per size)"""
+    return ctypes.c_char_p * argc
 
-_lib.cmd_model.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_model.restype = ctypes.c_int
-
-_lib.cmd_store.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_store.restype = ctypes.c_int
-
-_lib.cmd_status.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_status.restype = ctypes.c_int
-
-_lib.cmd_log.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_log.restype = ctypes.c_int
-
-_lib.cmd_diff.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_diff.restype = ctypes.c_int
-
-_lib.cmd_rm.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_rm.restype = ctypes.c_int
-
-_lib.cmd_switch.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_switch.restype = ctypes.c_int
-
-# Add definitions for missing cmd_ functions
-_lib.cmd_config.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_config.restype = ctypes.c_int
-
-_lib.cmd_gc.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_gc.restype = ctypes.c_int
-
-_lib.cmd_get.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_get.restype = ctypes.c_int
-
-_lib.cmd_merge.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_merge.restype = ctypes.c_int
-
-_lib.cmd_pull.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_pull.restype = ctypes.c_int
-
-_lib.cmd_push.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_push.restype = ctypes.c_int
-
-_lib.cmd_remote.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)]
-_lib.cmd_remote.restype = ctypes.c_int
+def _b(value):
+    """Encode str arguments as UTF-8, passing bytes through unchanged"""
+    return value.encode('utf-8') if isinstance(value, str) else value
 
 class EmbeddingStore:
     """Python wrapper for EmbeddingBridge vector store"""
@@ -154,7 +123,11 @@ class EmbeddingStore:
     
     def __del__(self):
         """Close the store when the object is garbage collected"""
-        self.close()
+        # Module globals such as _lib may already be gone at interpreter shutdown
+        try:
+            self.close()
+        except (AttributeError, TypeError):
+            pass
     
     def close(self):
         """Explicitly close the store"""
@@ -195,14 +168,14 @@ class EmbeddingStore:
         Returns:
             ID of the added vector
         """
-        # Convert vector to ctypes array
-        vector_array = np.array(vector, dtype=np.float32)
-        arr_type = ctypes.c_float * len(vector_array)
-        vector_arr = arr_type(*vector_array)
+        # Pass the numpy buffer directly (no copy if already contiguous float32);
+        # vector_array stays referenced until the call returns
+        vector_array = np.ascontiguousarray(vector, dtype=np.float32)
+        vector_ptr = vector_array.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
         
         # Create embedding
         embedding_ptr = ctypes.c_void_p()
-        result = _lib.embr_create_embedding(vector_arr, len(vector_array), ctypes.byref(embedding_ptr))
+        result = _lib.embr_create_embedding(vector_ptr, vector_array.size, ctypes.byref(embedding_ptr))
         if result != 0:
             raise RuntimeError(f"Failed to create embedding, error code: {result}")
         
@@ -223,11 +196,10 @@ class EmbeddingStore:
         """
         # Convert ID to integer if it's a string
         if isinstance(vector_id, str):
-            try:
-                id_num = int(vector_id)
-            except ValueError:
-                # If ID is not convertible to int, it's not a valid ID
+            # IDs are unsigned integers; reject anything else without try/except
+            if not (vector_id.isascii() and vector_id.isdigit()):
                 return None
+            id_num = int(vector_id)
         else:
             id_num = vector_id
         
@@ -297,75 +269,94 @@ class EmbeddingBridge:
             working_dir: Working directory for commands
         """
         self.working_dir = working_dir
+        self._cwd_fd = None
         if working_dir:
-            os.chdir(working_dir)
+            # Keep a handle on the directory and switch into it only for the
+            # duration of each command, rather than chdir'ing the process
+            self._cwd_fd = os.open(working_dir, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    
+    def __del__(self):
+        """Release the working directory handle"""
+        cwd_fd = getattr(self, '_cwd_fd', None)
+        if cwd_fd is None:
+            return
+        self._cwd_fd = None
+        # os may already be torn down at interpreter shutdown
+        try:
+            os.close(cwd_fd)
+        except (OSError, AttributeError, TypeError):
+            pass
     
     def _capture_stdout(self, func, argc, argv):
         """Helper method to capture stdout from C functions and return it as CommandResult"""
-        # Use temporary files for stdout and stderr redirection
-        with tempfile.NamedTemporaryFile(mode='w+b', delete=False) as stdout_file:
-            stdout_path = stdout_file.name
+        # Redirect stdout and stderr into pipes drained by reader threads,
+        # so nothing touches the filesystem
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        stdout_buf = bytearray()
+        stderr_buf = bytearray()
+        
+        def _drain(fd, buf):
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                buf.extend(chunk)
+        
+        readers = [
+            threading.Thread(target=_drain, args=(stdout_read, stdout_buf), daemon=True),
+            threading.Thread(target=_drain, args=(stderr_read, stderr_buf), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
         
-        with tempfile.NamedTemporaryFile(mode='w+b', delete=False) as stderr_file:
-            stderr_path = stderr_file.name
-            
         # Save original file descriptors
         original_stdout = os.dup(1)
         original_stderr = os.dup(2)
         
-        # Open the temporary files
-        stdout_fd = os.open(stdout_path, os.O_WRONLY)
-        stderr_fd = os.open(stderr_path, os.O_WRONLY)
-        
-        # Redirect stdout and stderr
-        os.dup2(stdout_fd, 1)
-        os.dup2(stderr_fd, 2)
+        # Redirect stdout and stderr; fds 1/2 now hold the only write ends
+        os.dup2(stdout_write, 1)
+        os.dup2(stderr_write, 2)
+        os.close(stdout_write)
+        os.close(stderr_write)
         
+        saved_cwd_fd = None
         try:
+            if self._cwd_fd is not None:
+                saved_cwd_fd = os.open('.', os.O_RDONLY)
+                os.fchdir(self._cwd_fd)
+            
             # Call the C function
             returncode = func(argc, argv)
-            
-            # Close the redirected files
-            os.close(stdout_fd)
-            os.close(stderr_fd)
-            
-            # Restore original stdout and stderr
-            os.dup2(original_stdout, 1)
-            os.dup2(original_stderr, 2)
-            
-            # Read the captured output
-            with open(stdout_path, 'rb') as f:
-                stdout_data = f.read().decode('utf-8', errors='replace')
-            
-            with open(stderr_path, 'rb') as f:
-                stderr_data = f.read().decode('utf-8', errors='replace')
-            
-            return CommandResult(returncode, stdout_data, stderr_data)
-            
         finally:
-            # Ensure original descriptors are restored
+            if saved_cwd_fd is not None:
+                os.fchdir(saved_cwd_fd)
+                os.close(saved_cwd_fd)
+            
+            # Restoring the descriptors closes the pipes' write ends, so the
+            # readers see EOF
             os.dup2(original_stdout, 1)
             os.dup2(original_stderr, 2)
             os.close(original_stdout)
             os.close(original_stderr)
             
-            # Clean up temporary files
-            try:
-                os.unlink(stdout_path)
-                os.unlink(stderr_path)
-            except:
-                pass
+            for reader in readers:
+                reader.join()
+            os.close(stdout_read)
+            os.close(stderr_read)
+        
+        return CommandResult(returncode,
+                             stdout_buf.decode('utf-8', errors='replace'),
+                             stderr_buf.decode('utf-8', errors='replace'))
+    
+    def _run(self, func, args):
+        """Build argv from a list of bytes arguments and run a cmd_* function"""
+        argc = len(args)
+        return self._capture_stdout(func, argc, _argv_type(argc)(*args))
     
     def init(self):
         """Initialize a new embedding repository."""
-        args = [b"init"]
-        
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_init, argc, argv)
+        return self._run(_lib.cmd_init, [b"init"])
     
     def model_register(self, name, dimensions, normalize=False, description=None):
         """Register a model configuration."""
@@ -383,40 +374,54 @@ class EmbeddingBridge:
             args.append(b"--description")
             args.append(description.encode('utf-8'))
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_model, argc, argv)
+        return self._run(_lib.cmd_model, args)
     
     def model_list(self):
         """List all registered models."""
-        args = [b"model", b"list"]
-        
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_model, argc, argv)
+        return self._run(_lib.cmd_model, [b"model", b"list"])
     
     def store(self, embedding_file, source_file):
         """Store an embedding for a source file."""
         args = [b"store"]
         
         # Add embedding file
-        args.append(embedding_file.encode('utf-8') if isinstance(embedding_file, str) else embedding_file)
+        args.append(_b(embedding_file))
         
         # Add source file
-        args.append(source_file.encode('utf-8') if isinstance(source_file, str) else source_file)
+        args.append(_b(source_file))
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
+        return self._run(_lib.cmd_store, args)
+    
+    def store_many(self, pairs):
+        """Store several embeddings under a single output capture.
+        
+        Args:
+            pairs: Iterable of (embedding_file, source_file) or
+                (embedding_file, source_file, model) tuples
         
-        return self._capture_stdout(_lib.cmd_store, argc, argv)
+        Returns:
+            CommandResult with the combined output; returncode is the first
+            non-zero code, or 0 if every store succeeded
+        """
+        calls = []
+        for embedding_file, source_file, *rest in pairs:
+            args = [b"store"]
+            if rest and rest[0]:
+                args += [b"--model", _b(rest[0])]
+            args += [_b(embedding_file), _b(source_file)]
+            argc = len(args)
+            calls.append((argc, _argv_type(argc)(*args)))
+        
+        # Run every store inside one redirect/chdir instead of one per file
+        def _store_all(_argc, _argv):
+            returncode = 0
+            for argc, argv in calls:
+                result = _lib.cmd_store(argc, argv)
+                if result != 0 and returncode == 0:
+                    returncode = result
+            return returncode
+        
+        return self._capture_stdout(_store_all, 0, None)
     
     def status(self, source_file=None, verbose=False):
         """Check status of tracked embeddings."""
@@ -424,89 +429,64 @@ class EmbeddingBridge:
         
         # Add source file if provided
         if source_file:
-            args.append(source_file.encode('utf-8') if isinstance(source_file, str) else source_file)
+            args.append(_b(source_file))
         
         # Add verbose flag if true
         if verbose:
             args.append(b"--verbose")
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_status, argc, argv)
+        return self._run(_lib.cmd_status, args)
     
     def log(self, source_file):
         """Show history of embeddings for a source file."""
         args = [b"log"]
         
         # Add source file
-        args.append(source_file.encode('utf-8') if isinstance(source_file, str) else source_file)
+        args.append(_b(source_file))
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_log, argc, argv)
+        return self._run(_lib.cmd_log, args)
     
     def diff(self, hash1, hash2):
         """Compare two embedding versions."""
         args = [b"diff"]
         
         # Add hashes
-        args.append(hash1.encode('utf-8') if isinstance(hash1, str) else hash1)
-        args.append(hash2.encode('utf-8') if isinstance(hash2, str) else hash2)
-        
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
+        args.append(_b(hash1))
+        args.append(_b(hash2))
         
-        return self._capture_stdout(_lib.cmd_diff, argc, argv)
+        return self._run(_lib.cmd_diff, args)
     
     def rm(self, source_file, model=None, cached=False):
         """Remove an embedding or untrack a file."""
         args = [b"rm"]
         
         # Add source file
-        args.append(source_file.encode('utf-8') if isinstance(source_file, str) else source_file)
+        args.append(_b(source_file))
         
         # Add model if provided
         if model:
             args.append(b"--model")
-            args.append(model.encode('utf-8') if isinstance(model, str) else model)
+            args.append(_b(model))
         
         # Add cached flag if true
         if cached:
             args.append(b"--cached")
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_rm, argc, argv)
+        return self._run(_lib.cmd_rm, args)
     
     def rollback(self, hash_value, source_file, model=None):
         """Revert to a previous embedding version."""
         # Format arguments based on the expected format: eb rollback [options] <hash> <source>
         if model:
-            args = [b"rollback", b"--model", model.encode('utf-8') if isinstance(model, str) else model, 
-                   hash_value.encode('utf-8') if isinstance(hash_value, str) else hash_value,
-                   source_file.encode('utf-8') if isinstance(source_file, str) else source_file]
+            args = [b"rollback", b"--model", _b(model), 
+                   _b(hash_value),
+                   _b(source_file)]
         else:
             args = [b"rollback", 
-                   hash_value.encode('utf-8') if isinstance(hash_value, str) else hash_value,
-                   source_file.encode('utf-8') if isinstance(source_file, str) else source_file]
-        
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
+                   _b(hash_value),
+                   _b(source_file)]
         
-        return self._capture_stdout(_lib.cmd_rollback, argc, argv)
+        return self._run(_lib.cmd_rollback, args)
     
     def set_create(self, name, description=None, base_set=None):
         """Create a new embedding set."""
@@ -516,21 +496,16 @@ class EmbeddingBridge:
         # Add options
         if description:
             args.append(b"--description")
-            args.append(description.encode('utf-8') if isinstance(description, str) else description)
+            args.append(_b(description))
         
         if base_set:
             args.append(b"--base")
-            args.append(base_set.encode('utf-8') if isinstance(base_set, str) else base_set)
+            args.append(_b(base_set))
         
         # Add set name
-        args.append(name.encode('utf-8') if isinstance(name, str) else name)
-        
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
+        args.append(_b(name))
         
-        return self._capture_stdout(_lib.cmd_set, argc, argv)
+        return self._run(_lib.cmd_set, args)
     
     def set_list(self, verbose=False):
         """List all embedding sets."""
@@ -541,100 +516,64 @@ class EmbeddingBridge:
         if verbose:
             args.append(b"--verbose")
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_set, argc, argv)
+        return self._run(_lib.cmd_set, args)
     
     def set_switch(self, name):
         """Switch to a different embedding set."""
         # Format arguments based on the expected format: eb switch <set-name>
-        args = [b"switch", name.encode('utf-8') if isinstance(name, str) else name]
-        
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
+        args = [b"switch", _b(name)]
         
-        return self._capture_stdout(_lib.cmd_switch, argc, argv)
+        return self._run(_lib.cmd_switch, args)
     
     def set_status(self):
         """Show status of the current embedding set."""
         # Format arguments based on set command with specific status flag
         args = [b"set", b"--status"]
         
-        # Convert to C array
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        
-        return self._capture_stdout(_lib.cmd_set, argc, argv)
+        return self._run(_lib.cmd_set, args)
 
     # New methods for additional CLI commands
     def config(self, *cmd_args):
         """Run a config command with provided arguments."""
-        args = [b"config"] + [a.encode('utf-8') if isinstance(a, str) else a for a in cmd_args]
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_config, argc, argv)
+        args = [b"config"] + [_b(a) for a in cmd_args]
+        return self._run(_lib.cmd_config, args)
 
     def gc(self, *options):
         """Run garbage collection. Pass options like '-n' for dry-run."""
-        args = [b"gc"] + [opt.encode('utf-8') if isinstance(opt, str) else opt for opt in options]
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_gc, argc, argv)
+        args = [b"gc"] + [_b(opt) for opt in options]
+        return self._run(_lib.cmd_gc, args)
 
     def get(self, remote, path):
         """Download a file or directory from a remote repository."""
-        args = [b"get", remote.encode('utf-8') if isinstance(remote, str) else remote,
-                path.encode('utf-8') if isinstance(path, str) else path]
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_get, argc, argv)
+        args = [b"get", _b(remote),
+                _b(path)]
+        return self._run(_lib.cmd_get, args)
 
     def merge(self, source_set, target_set=None, strategy=None):
         """Merge embeddings from one set to another."""
-        args = [b"merge", source_set.encode('utf-8') if isinstance(source_set, str) else source_set]
+        args = [b"merge", _b(source_set)]
         if target_set:
-            args.append(target_set.encode('utf-8') if isinstance(target_set, str) else target_set)
+            args.append(_b(target_set))
         if strategy:
             args.append(b"--strategy")
-            args.append(strategy.encode('utf-8') if isinstance(strategy, str) else strategy)
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_merge, argc, argv)
+            args.append(_b(strategy))
+        return self._run(_lib.cmd_merge, args)
 
     def push(self, remote, set_name=None):
         """Push a set to a remote."""
-        args = [b"push", remote.encode('utf-8') if isinstance(remote, str) else remote]
+        args = [b"push", _b(remote)]
         if set_name:
-            args.append(set_name.encode('utf-8') if isinstance(set_name, str) else set_name)
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_push, argc, argv)
+            args.append(_b(set_name))
+        return self._run(_lib.cmd_push, args)
 
     def pull(self, remote, set_name=None):
         """Pull a set from a remote."""
-        args = [b"pull", remote.encode('utf-8') if isinstance(remote, str) else remote]
+        args = [b"pull", _b(remote)]
         if set_name:
-            args.append(set_name.encode('utf-8') if isinstance(set_name, str) else set_name)
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_pull, argc, argv)
+            args.append(_b(set_name))
+        return self._run(_lib.cmd_pull, args)
 
     def remote(self, *subargs):
         """Manage remotes (add, list, remove, etc.)."""
-        args = [b"remote"] + [a.encode('utf-8') if isinstance(a, str) else a for a in subargs]
-        argc = len(args)
-        argv_type = ctypes.c_char_p * argc
-        argv = argv_type(*args)
-        return self._capture_stdout(_lib.cmd_remote, argc, argv) 
\ No newline at end of file
+        args = [b"remote"] + [_b(a) for a in subargs]
+        return self._run(_lib.cmd_remote, args) 
\ No newline at end of file
@@ -56,9 +56,11 @@ def copy_shared_lib():
 # Try to copy the shared library
 copy_shared_lib()
 
-# Read requirements from file
-with open('requirements.txt') as f:
-    requirements = f.read().splitlines()
+# Read requirements from file, skipping blank lines and comments
+requirements = [
+    line for line in (l.strip() for l in Path('requirements.txt').read_text().splitlines())
+    if line and not line.startswith('#')
+]
 
 # Read long description from README
 long_description = """
@@ -490,8 +490,9 @@ static int get_embedding_by_hash(
     
     // Clean up any temporary files if we used remote repositories
     if (found_remote) {
-        if (access(temp_meta_path, F_OK) == 0) unlink(temp_meta_path);
-        if (access(temp_object_path, F_OK) == 0) unlink(temp_object_path);
+        /* unlink() reports ENOENT itself; no need to probe with access() */
+        unlink(temp_meta_path);
+        unlink(temp_object_path);
     }
     
     return 0;
@@ -312,18 +312,15 @@ int store_from_source(const char *source_file, int argc, char **argv)
             return 1;
         }
 
-        // Generate embedding using configured model
-        eb_status_t status = eb_create_embedding_from_file(source_file, model, &embedding);
+        // Generate embedding using configured model; the source is read
+        // once and hashed from the same buffer
+        eb_status_t status = eb_create_embedding_from_file_hashed(source_file, model,
+                                                                  &embedding, hash);
         if (status != EB_SUCCESS) {
             cli_error("Failed to create embedding: %s", eb_status_str(status));
                 goto cleanup;
         }
 
-        if (!eb_calculate_file_hash(source_file, hash)) {
-                cli_error("Failed to calculate file hash");
-                goto cleanup;
-        }
-
         DEBUG_PRINT("store_from_source: source_file=%s\n", source_file);
 
         if (!cli_store_embedding_file(source_file, source_file, cwd, model)) {
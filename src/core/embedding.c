@@ -600,12 +600,20 @@ eb_status_t eb_generate_embedding(const char* text, const char* model_name, eb_e
 eb_status_t eb_create_embedding_from_file(const char* filepath,
                                      const char* model_name,
                                      eb_embedding_t** out_embedding) {
+    return eb_create_embedding_from_file_hashed(filepath, model_name,
+                                                out_embedding, NULL);
+}
+
+eb_status_t eb_create_embedding_from_file_hashed(const char* filepath,
+                                            const char* model_name,
+                                            eb_embedding_t** out_embedding,
+                                            char* hash_out) {
     if (!filepath || !model_name || !out_embedding) {
         return EB_ERROR_INVALID_INPUT;
     }
 
     // Read file content
-    FILE* file = fopen(filepath, "r");
+    FILE* file = fopen(filepath, "rb");
     if (!file) {
         return EB_ERROR_FILE_IO;
     }
@@ -614,6 +622,10 @@ eb_status_t eb_create_embedding_from_file(const char* filepath,
     fseek(file, 0, SEEK_END);
     long file_size = ftell(file);
     fseek(file, 0, SEEK_SET);
+    if (file_size < 0) {
+        fclose(file);
+        return EB_ERROR_FILE_IO;
+    }
 
     // Allocate buffer for file content
     char* content = malloc(file_size + 1);
@@ -627,6 +639,12 @@ eb_status_t eb_create_embedding_from_file(const char* filepath,
     fclose(file);
     content[bytes_read] = '\0';
 
+    // Hash the bytes we already hold instead of reading the file again
+    if (hash_out && !eb_calculate_buffer_hash(content, bytes_read, hash_out)) {
+        free(content);
+        return EB_ERROR_COMPUTATION_FAILED;
+    }
+
     // Generate embedding - let eb_generate_embedding handle allocation
     eb_status_t status = eb_generate_embedding(content, model_name, out_embedding);
     free(content);
@@ -641,12 +659,43 @@ void eb_destroy_embedding(eb_embedding_t* embedding) {
     }
 }
 
+/* Widen an IEEE 754 half-precision value to float */
+static float half_to_float(uint16_t h) {
+    uint32_t sign = (uint32_t)(h & 0x8000) << 16;
+    uint32_t exponent = (h >> 10) & 0x1f;
+    uint32_t mantissa = h & 0x3ff;
+    uint32_t bits;
+
+    if (exponent == 0x1f) {
+        // Inf / NaN
+        bits = sign | 0x7f800000 | (mantissa << 13);
+    } else if (exponent != 0) {
+        // Normal: rebias exponent from 15 to 127
+        bits = sign | ((exponent + 112) << 23) | (mantissa << 13);
+    } else if (mantissa == 0) {
+        bits = sign;
+    } else {
+        // Subnormal half becomes a normal float
+        exponent = 113;
+        while (!(mantissa & 0x400)) {
+            mantissa <<= 1;
+            exponent--;
+        }
+        bits = sign | (exponent << 23) | ((mantissa & 0x3ff) << 13);
+    }
+
+    float value;
+    memcpy(&value, &bits, sizeof(value));
+    return value;
+}
+
 size_t eb_get_dtype_size(eb_dtype_t dtype) {
     switch (dtype) {
         case EB_FLOAT32: return 4;
         case EB_FLOAT64: return 8;
         case EB_INT32: return 4;
         case EB_INT64: return 8;
+        case EB_FLOAT16: return 2;
         default: return 0;
     }
 }
@@ -706,6 +755,13 @@ eb_status_t eb_create_embedding(
             }
             break;
         }
+        case EB_FLOAT16: {
+            uint16_t* half_data = (uint16_t*)data;
+            for (size_t i = 0; i < dimensions; i++) {
+                (*out_embedding)->values[i] = half_to_float(half_data[i]);
+            }
+            break;
+        }
         default:
             free((*out_embedding)->values);
             free(*out_embedding);
@@ -750,6 +806,11 @@ eb_status_t eb_normalize_embedding(eb_embedding_t* embedding) {
     for (size_t i = 0; i < embedding->dimensions; i++) {
         norm += embedding->values[i] * embedding->values[i];
     }
+
+    // Already unit length (common for API-provided embeddings): skip the rescale pass
+    if (fabsf(norm - 1.0f) < 1e-6f) {
+        return EB_SUCCESS;
+    }
     norm = sqrtf(norm);
 
     // Avoid division by zero
@@ -757,9 +818,10 @@ eb_status_t eb_normalize_embedding(eb_embedding_t* embedding) {
         return EB_ERROR_INVALID_INPUT;
     }
 
-    // Normalize values
+    // Normalize values, scaling by the reciprocal rather than dividing per element
+    float inv_norm = 1.0f / norm;
     for (size_t i = 0; i < embedding->dimensions; i++) {
-        embedding->values[i] /= norm;
+        embedding->values[i] *= inv_norm;
     }
 
     return EB_SUCCESS;
@@ -910,4 +972,21 @@ bool eb_calculate_file_hash(const char *file_path, char *hash_out)
         hash_out[64] = '\0';
 
         return true;
-} 
\ No newline at end of file
+} 
+
+bool eb_calculate_buffer_hash(const void *data, size_t size, char *hash_out)
+{
+        unsigned char hash[EVP_MAX_MD_SIZE];
+        unsigned int hash_len;
+
+        if (EVP_Digest(data, size, hash, &hash_len, EVP_sha256(), NULL) != 1)
+                return false;
+
+        /* Convert to hex string */
+        for (unsigned int i = 0; i < hash_len; i++) {
+                sprintf(hash_out + (i * 2), "%02x", hash[i]);
+        }
+        hash_out[hash_len * 2] = '\0';
+
+        return true;
+}
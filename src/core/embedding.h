@@ -43,6 +43,10 @@ void eb_cleanup_registry(void);
 eb_status_t eb_get_model_info(const char* model_name, eb_model_info_t* out_info);
 eb_status_t eb_generate_embedding(const char* text, const char* model_name, eb_embedding_t** out_embedding);
 eb_status_t eb_create_embedding_from_file(const char* filepath, const char* model_name, eb_embedding_t** out_embedding);
+/* Same as eb_create_embedding_from_file, but also writes the SHA-256 hex digest
+ * of the file (65 bytes) to hash_out when it is not NULL, reading the file once */
+eb_status_t eb_create_embedding_from_file_hashed(const char* filepath, const char* model_name,
+                                                 eb_embedding_t** out_embedding, char* hash_out);
 eb_status_t eb_normalize_embedding(eb_embedding_t* embedding);
 
 /**
@@ -55,5 +59,6 @@ eb_status_t eb_normalize_embedding(eb_embedding_t* embedding);
 eb_status_t eb_find_similar_models(const char* name, char*** similar_names, size_t* count);
 
 bool eb_calculate_file_hash(const char *file_path, char *hash_out);
+bool eb_calculate_buffer_hash(const void *data, size_t size, char *hash_out);
 
 #endif // EMBEDDING_BRIDGE_EMBEDDING_H
\ No newline at end of file
@@ -23,27 +23,25 @@
 #include <math.h>
 #include <stdio.h>
 
-// Global comparison context for qsort
-static float* g_distances_a = NULL;
-static float* g_distances_b = NULL;
-
-// Comparison functions for qsort
-static int compare_distances_a(const void* a, const void* b) {
-    size_t idx_a = *(const size_t*)a;
-    size_t idx_b = *(const size_t*)b;
-    
-    if (g_distances_a[idx_a] < g_distances_a[idx_b]) return -1;
-    if (g_distances_a[idx_a] > g_distances_a[idx_b]) return 1;
-    return 0;
-}
-
-static int compare_distances_b(const void* a, const void* b) {
-    size_t idx_a = *(const size_t*)a;
-    size_t idx_b = *(const size_t*)b;
-    
-    if (g_distances_b[idx_a] < g_distances_b[idx_b]) return -1;
-    if (g_distances_b[idx_a] > g_distances_b[idx_b]) return 1;
-    return 0;
+// Collect the indices of the k smallest squared values into out (ascending),
+// squaring on the fly so no n-sized distance array is materialized.
+// Insertion into a k-sized window is O(n*k), cheaper than a full sort for k << n.
+static void select_k_smallest_squares(const float* values, size_t n, size_t k,
+                                      size_t* out, float* out_dist) {
+    size_t count = 0;
+    for (size_t i = 0; i < n; i++) {
+        float d = values[i] * values[i];
+        if (count == k && d >= out_dist[k - 1]) continue;
+
+        size_t pos = count < k ? count++ : k - 1;
+        while (pos > 0 && out_dist[pos - 1] > d) {
+            out[pos] = out[pos - 1];
+            out_dist[pos] = out_dist[pos - 1];
+            pos--;
+        }
+        out[pos] = i;
+        out_dist[pos] = d;
+    }
 }
 
 // Helper functions
@@ -67,6 +65,29 @@ static float compute_magnitude(const float* values, size_t dimensions) {
     return sqrtf(sum);
 }
 
+// Squared L2 distance with four independent accumulators, so the compiler
+// can keep several lanes in flight (and vectorize) instead of serializing
+// every add on a single running sum
+static float squared_l2_distance(const float* a, const float* b, size_t dimensions) {
+    float acc0 = 0.0f, acc1 = 0.0f, acc2 = 0.0f, acc3 = 0.0f;
+    size_t i = 0;
+    for (; i + 4 <= dimensions; i += 4) {
+        float d0 = a[i] - b[i];
+        float d1 = a[i + 1] - b[i + 1];
+        float d2 = a[i + 2] - b[i + 2];
+        float d3 = a[i + 3] - b[i + 3];
+        acc0 += d0 * d0;
+        acc1 += d1 * d1;
+        acc2 += d2 * d2;
+        acc3 += d3 * d3;
+    }
+    for (; i < dimensions; i++) {
+        float d = a[i] - b[i];
+        acc0 += d * d;
+    }
+    return (acc0 + acc1) + (acc2 + acc3);
+}
+
 static void normalize_vector(float* vector, size_t dimensions) {
     float magnitude = compute_magnitude(vector, dimensions);
     if (magnitude > 0.0f) {
@@ -156,12 +177,29 @@ eb_status_t eb_compute_cosine_similarity(
     }
 
     float dot_product = 0.0f;
+
+    // Normalized embeddings are unit length, so cosine is just the dot product
+    if (a->normalize && b->normalize) {
+        for (size_t i = 0; i < a->dimensions; i++) {
+            dot_product += a->values[i] * b->values[i];
+        }
+        *result = dot_product;
+        return EB_SUCCESS;
+    }
+
+    // Dot product and both squared magnitudes in a single pass
+    float sum_a = 0.0f;
+    float sum_b = 0.0f;
     for (size_t i = 0; i < a->dimensions; i++) {
-        dot_product += a->values[i] * b->values[i];
+        float va = a->values[i];
+        float vb = b->values[i];
+        dot_product += va * vb;
+        sum_a += va * va;
+        sum_b += vb * vb;
     }
 
-    float mag_a = compute_magnitude(a->values, a->dimensions);
-    float mag_b = compute_magnitude(b->values, b->dimensions);
+    float mag_a = sqrtf(sum_a);
+    float mag_b = sqrtf(sum_b);
 
     if (mag_a < 1e-10f || mag_b < 1e-10f) {
         return EB_ERROR_COMPUTATION_FAILED;
@@ -180,13 +218,7 @@ eb_status_t eb_compute_euclidean_distance(
         return EB_ERROR_INVALID_INPUT;
     }
 
-    float sum = 0.0f;
-    for (size_t i = 0; i < a->dimensions; i++) {
-        float diff = a->values[i] - b->values[i];
-        sum += diff * diff;
-    }
-
-    *result = sqrtf(sum);
+    *result = sqrtf(squared_l2_distance(a->values, b->values, a->dimensions));
     return EB_SUCCESS;
 }
 
@@ -216,12 +248,14 @@ eb_status_t eb_compute_neighborhood_preservation(
     const float* values_a = old_vectors->values;
     const float* values_b = new_vectors->values;
 
-    // Compute distances and store indices
+    // Compute distances and collect the k nearest indices
     size_t n = old_vectors->dimensions;
-    float* distances_a = malloc(n * sizeof(float));
-    float* distances_b = malloc(n * sizeof(float));
-    size_t* indices_a = malloc(n * sizeof(size_t));
-    size_t* indices_b = malloc(n * sizeof(size_t));
+    if (k > n) k = n;
+
+    float* distances_a = malloc(k * sizeof(float));
+    float* distances_b = malloc(k * sizeof(float));
+    size_t* indices_a = malloc(k * sizeof(size_t));
+    size_t* indices_b = malloc(k * sizeof(size_t));
 
     if (!distances_a || !distances_b || !indices_a || !indices_b) {
         free(distances_a);
@@ -231,29 +265,9 @@ eb_status_t eb_compute_neighborhood_preservation(
         return EB_ERROR_MEMORY_ALLOCATION;
     }
 
-    // Initialize indices
-    for (size_t i = 0; i < n; i++) {
-        indices_a[i] = i;
-        indices_b[i] = i;
-    }
-
-    // Compute distances
-    for (size_t i = 0; i < n; i++) {
-        distances_a[i] = values_a[i] * values_a[i];
-        distances_b[i] = values_b[i] * values_b[i];
-    }
-
-    // Set global comparison contexts
-    g_distances_a = distances_a;
-    g_distances_b = distances_b;
-
-    // Sort indices by distance
-    qsort(indices_a, n, sizeof(size_t), compare_distances_a);
-    qsort(indices_b, n, sizeof(size_t), compare_distances_b);
-
-    // Clear global comparison contexts
-    g_distances_a = NULL;
-    g_distances_b = NULL;
+    // Single pass per vector: distance and top-k selection together
+    select_k_smallest_squares(values_a, n, k, indices_a, distances_a);
+    select_k_smallest_squares(values_b, n, k, indices_b, distances_b);
 
     // Count preserved neighbors
     size_t preserved = 0;
@@ -287,8 +301,11 @@ eb_status_t eb_compare_memory_versions(
     }
 
     // Initialize the result structure
+    out_comparison->cosine_similarity = 0.0f;
+    out_comparison->euclidean_distance = 0.0f;
     out_comparison->neighborhood_scores = NULL;
     out_comparison->neighborhood_count = 0;
+    out_comparison->semantic_preservation = 0.0f;
     out_comparison->method_used = EB_COMPARE_COSINE;
 
     // Check if dimensions match
@@ -313,12 +330,18 @@ eb_status_t eb_compare_memory_versions(
     }
 
     // Original same-dimension comparison logic
-    return eb_compare_embeddings(
+    eb_status_t status = eb_compare_embeddings(
         version_a->embedding,
         version_b->embedding,
         10,  // Default k-neighbors
         &out_comparison
     );
+
+    // Report neighborhood preservation as the semantic preservation score
+    if (status == EB_SUCCESS && out_comparison->neighborhood_count > 0) {
+        out_comparison->semantic_preservation = out_comparison->neighborhood_scores[0];
+    }
+    return status;
 }
 
 // Forward declare helper function for projection
@@ -344,15 +367,22 @@ eb_status_t eb_compare_embeddings(
 
     eb_comparison_result_t* result = *out_result;
 
-    // Compute cosine similarity
+    // Cosine and Euclidean terms in a single pass over both vectors
+    const float* values_a = embedding_a->values;
+    const float* values_b = embedding_b->values;
     float dot_product = 0.0f;
     float norm_a = 0.0f;
     float norm_b = 0.0f;
+    float sum_squared = 0.0f;
 
     for (size_t i = 0; i < embedding_a->dimensions; i++) {
-        dot_product += embedding_a->values[i] * embedding_b->values[i];
-        norm_a += embedding_a->values[i] * embedding_a->values[i];
-        norm_b += embedding_b->values[i] * embedding_b->values[i];
+        float va = values_a[i];
+        float vb = values_b[i];
+        float diff = va - vb;
+        dot_product += va * vb;
+        norm_a += va * va;
+        norm_b += vb * vb;
+        sum_squared += diff * diff;
     }
 
     norm_a = sqrtf(norm_a);
@@ -363,13 +393,6 @@ eb_status_t eb_compare_embeddings(
     }
 
     result->cosine_similarity = dot_product / (norm_a * norm_b);
-
-    // Compute Euclidean distance
-    float sum_squared = 0.0f;
-    for (size_t i = 0; i < embedding_a->dimensions; i++) {
-        float diff = embedding_a->values[i] - embedding_b->values[i];
-        sum_squared += diff * diff;
-    }
     result->euclidean_distance = sqrtf(sum_squared);
 
     // Compute neighborhood preservation if k_neighbors > 0
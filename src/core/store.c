@@ -16,6 +16,7 @@
 #include <time.h>
 #include <sys/stat.h>
 #include <stdio.h>
+#include <stdarg.h>
 #include <errno.h>
 #include <openssl/evp.h>
 #include <openssl/crypto.h>
@@ -106,7 +107,22 @@ static void hash_bytes(const unsigned char* data, size_t size, uint8_t* hash) {
 
 static uint64_t generate_id(const void* data, size_t size) {
     uint8_t hash[32];
-    hash_data((const float*)data, size, hash);
+    hash_data((const float*)data, size, hash);  // size counts floats, not bytes
+    return *(uint64_t*)hash;  // Use first 8 bytes of hash as ID
+}
+
+/* Hash an object's bytes: whole float arrays via hash_data, anything else raw */
+static void hash_object(const void* data, size_t size, uint8_t* hash) {
+    if (size % sizeof(float) == 0) {
+        hash_data((const float*)data, size / sizeof(float), hash);
+    } else {
+        hash_bytes((const unsigned char*)data, size, hash);
+    }
+}
+
+static uint64_t generate_text_id(const char* text) {
+    uint8_t hash[32];
+    hash_bytes((const unsigned char*)text, strlen(text), hash);
     return *(uint64_t*)hash;  // Use first 8 bytes of hash as ID
 }
 
@@ -283,7 +299,7 @@ static eb_status_t write_object(
     char out_hash[65]
 ) {
     uint8_t hash[32];
-    hash_data((const float*)data, size, hash);
+    hash_object(data, size, hash);
     hash_to_hex(hash, out_hash);
     
     // Create temporary file path
@@ -320,8 +336,9 @@ static eb_status_t write_object(
         DEBUG_INFO("Compressed vector data from %zu to %zu bytes (ratio: %.2f%%)",
                  size, compressed_size, (double)compressed_size * 100.0 / (double)size);
         
-        // Set the compressed flag
-        flags |= EB_FLAG_COMPRESSED;
+        // Set the compressed flag, and mark the hash as reproducible so
+        // read_object can verify it
+        flags |= EB_FLAG_COMPRESSED | EB_FLAG_EXACT_HASH;
     } else {
         // For non-vector data, just use as-is
         compressed_data = (void*)data;
@@ -461,9 +478,9 @@ eb_status_t eb_store_vector(
     // Calculate total size
     size_t data_size = embedding->dimensions * sizeof(float);
     
-    // Generate ID from data
+    // Generate ID from data, the same hash write_object names the object by
     uint8_t hash[32];
-    hash_data(embedding->values, data_size, hash);
+    hash_object(embedding->values, data_size, hash);
     *out_id = *(uint64_t*)hash;  // Use first 8 bytes as ID
     
     // Write vector object
@@ -692,7 +709,8 @@ eb_status_t read_object(
             return EB_ERROR_INVALID_FORMAT;
         }
         
-        // Debug the decompressed data
+#ifdef EB_DEBUG_ENABLED
+        // Debug the decompressed data (compiled out with the debug macros)
         if (final_size >= 16) {
             DEBUG_INFO("First 16 bytes of decompressed data:");
             char debug_buf[100];
@@ -706,19 +724,26 @@ eb_status_t read_object(
             memcpy(&possible_dims, final_data, sizeof(uint32_t));
             DEBUG_INFO("First 4 bytes as uint32: %u (0x%08x)", possible_dims, possible_dims);
         }
+#endif
     } else {
         // Data is not compressed, just use raw_data
         final_data = raw_data;
         final_size = data_size;
     }
     
-    // Verify hash for vector objects
+    // Verify hash for vector objects. Objects written before
+    // EB_FLAG_EXACT_HASH were hashed over memory past the end of their data,
+    // so their stored hash cannot be recomputed and is not checked
     if (header.obj_type == EB_OBJ_VECTOR) {
-        uint8_t computed_hash[32];
-        hash_data((const float*)final_data, final_size, computed_hash);
-        if (memcmp(computed_hash, header.hash, 32) != 0) {
-            free(final_data);
-            return EB_ERROR_HASH_MISMATCH;
+        if (header.flags & EB_FLAG_EXACT_HASH) {
+            uint8_t computed_hash[32];
+            hash_object(final_data, final_size, computed_hash);
+            if (memcmp(computed_hash, header.hash, 32) != 0) {
+                free(final_data);
+                return EB_ERROR_HASH_MISMATCH;
+            }
+        } else {
+            DEBUG_INFO("Skipping hash check for legacy object %s", hash);
         }
     }
     
@@ -867,6 +892,183 @@ eb_status_t eb_metadata_create(const char* key, const char* value, eb_metadata_t
     return EB_SUCCESS;
 }
 
+eb_status_t eb_metadata_create_batch(
+    const char* const* keys,
+    const char* const* values,
+    size_t count,
+    eb_metadata_t** out
+) {
+    if (!keys || !values || !out) return EB_ERROR_INVALID_INPUT;
+
+    // Build the whole list in one call, linking each node onto the tail
+    eb_metadata_t* head = NULL;
+    eb_metadata_t** tail = &head;
+    for (size_t i = 0; i < count; i++) {
+        if (!keys[i] || !values[i]) {
+            eb_metadata_destroy(head);
+            return EB_ERROR_INVALID_INPUT;
+        }
+
+        eb_status_t status = eb_metadata_create(keys[i], values[i], tail);
+        if (status != EB_SUCCESS) {
+            eb_metadata_destroy(head);
+            return status;
+        }
+        tail = &(*tail)->next;
+    }
+
+    *out = head;
+    return EB_SUCCESS;
+}
+
+/* Write src as a JSON string literal into dst (if non-NULL); returns its length */
+static size_t metadata_json_string(const char* src, char* dst) {
+    static const char hex[] = "0123456789abcdef";
+    size_t len = 0;
+
+    if (dst) dst[len] = '"';
+    len++;
+    for (const unsigned char* p = (const unsigned char*)src; *p; p++) {
+        char esc = 0;
+        switch (*p) {
+            case '"':  esc = '"';  break;
+            case '\\': esc = '\\'; break;
+            case '\b': esc = 'b';  break;
+            case '\f': esc = 'f';  break;
+            case '\n': esc = 'n';  break;
+            case '\r': esc = 'r';  break;
+            case '\t': esc = 't';  break;
+            default: break;
+        }
+        if (esc) {
+            if (dst) {
+                dst[len] = '\\';
+                dst[len + 1] = esc;
+            }
+            len += 2;
+        } else if (*p < 0x20) {
+            if (dst) {
+                memcpy(dst + len, "\\u00", 4);
+                dst[len + 4] = hex[*p >> 4];
+                dst[len + 5] = hex[*p & 0xf];
+            }
+            len += 6;
+        } else {
+            if (dst) dst[len] = (char)*p;
+            len++;
+        }
+    }
+    if (dst) dst[len] = '"';
+    len++;
+    return len;
+}
+
+/* Write the metadata list as a JSON object into dst (if non-NULL); returns its length */
+static size_t metadata_json_object(const eb_metadata_t* head, char* dst) {
+    size_t len = 0;
+
+    if (dst) dst[len] = '{';
+    len++;
+    for (const eb_metadata_t* meta = head; meta; meta = meta->next) {
+        if (meta != head) {
+            if (dst) dst[len] = ',';
+            len++;
+        }
+        len += metadata_json_string(meta->key, dst ? dst + len : NULL);
+        if (dst) dst[len] = ':';
+        len++;
+        len += metadata_json_string(meta->value, dst ? dst + len : NULL);
+    }
+    if (dst) dst[len] = '}';
+    len++;
+    return len;
+}
+
+eb_status_t eb_metadata_to_json(
+    const eb_metadata_t* head,
+    char** out_json,
+    size_t* out_len
+) {
+    if (!out_json) return EB_ERROR_INVALID_INPUT;
+
+    for (const eb_metadata_t* meta = head; meta; meta = meta->next) {
+        if (!meta->key || !meta->value) return EB_ERROR_INVALID_INPUT;
+    }
+
+    // Size the whole object first so the list is serialized in one allocation
+    size_t len = metadata_json_object(head, NULL);
+    char* json = malloc(len + 1);
+    if (!json) return EB_ERROR_MEMORY_ALLOCATION;
+
+    metadata_json_object(head, json);
+    json[len] = '\0';
+
+    *out_json = json;
+    if (out_len) *out_len = len;
+    return EB_SUCCESS;
+}
+
+eb_status_t eb_metadata_list_to_json_array(
+    const eb_stored_vector_t* versions,
+    size_t count,
+    char** out_json,
+    size_t* out_len
+) {
+    if ((!versions && count > 0) || !out_json) return EB_ERROR_INVALID_INPUT;
+
+    for (size_t i = 0; i < count; i++) {
+        for (const eb_metadata_t* meta = versions[i].metadata; meta; meta = meta->next) {
+            if (!meta->key || !meta->value) return EB_ERROR_INVALID_INPUT;
+        }
+    }
+
+    // One array of per-version objects, sized up front and written in place
+    size_t len = 2 + (count > 0 ? count - 1 : 0);
+    for (size_t i = 0; i < count; i++) {
+        len += metadata_json_object(versions[i].metadata, NULL);
+    }
+
+    char* json = malloc(len + 1);
+    if (!json) return EB_ERROR_MEMORY_ALLOCATION;
+
+    size_t pos = 0;
+    json[pos++] = '[';
+    for (size_t i = 0; i < count; i++) {
+        if (i > 0) json[pos++] = ',';
+        pos += metadata_json_object(versions[i].metadata, json + pos);
+    }
+    json[pos++] = ']';
+    json[pos] = '\0';
+
+    *out_json = json;
+    if (out_len) *out_len = pos;
+    return EB_SUCCESS;
+}
+
+/* Append formatted text at *pos, doubling the buffer until it fits */
+static bool evolution_appendf(char** buffer, size_t* buffer_size, size_t* pos,
+                              const char* fmt, ...) {
+    for (;;) {
+        size_t avail = *buffer_size - *pos;
+        va_list args;
+        va_start(args, fmt);
+        int written = vsnprintf(*buffer + *pos, avail, fmt, args);
+        va_end(args);
+        if (written < 0) return false;
+        if ((size_t)written < avail) {
+            *pos += (size_t)written;
+            return true;
+        }
+
+        size_t new_size = *buffer_size * 2;
+        while (new_size - *pos <= (size_t)written) new_size *= 2;
+        char* new_buffer = realloc(*buffer, new_size);
+        if (!new_buffer) return false;
+        *buffer = new_buffer;
+        *buffer_size = new_size;
+    }
+}
+
 eb_status_t eb_format_evolution(
     const eb_stored_vector_t* versions,
     size_t version_count,
@@ -886,79 +1088,62 @@ eb_status_t eb_format_evolution(
 
     size_t current_pos = 0;
     
-    // Helper function to safely append to buffer
-    #define APPEND_STR(str) do { \
-        size_t len = strlen(str); \
-        if (current_pos + len >= buffer_size) { \
-            buffer_size *= 2; \
-            char* new_buffer = realloc(buffer, buffer_size); \
-            if (!new_buffer) { \
-                free(buffer); \
-                return EB_ERROR_MEMORY_ALLOCATION; \
-            } \
-            buffer = new_buffer; \
+    // Format straight into the output buffer, growing it as needed
+    #define APPENDF(...) do { \
+        if (!evolution_appendf(&buffer, &buffer_size, &current_pos, __VA_ARGS__)) { \
+            free(buffer); \
+            return EB_ERROR_MEMORY_ALLOCATION; \
         } \
-        strcpy(buffer + current_pos, str); \
-        current_pos += len; \
     } while(0)
 
+    // Load the timezone once; localtime_r then skips the per-call lookup
+    tzset();
+
     // Format each version
     for (size_t i = 0; i < version_count; i++) {
         const eb_stored_vector_t* version = &versions[i];
-        char temp[256];  // Temporary buffer for formatting
 
         // Format version marker and ID
-        snprintf(temp, sizeof(temp), "%c Vector ID: %lu\n", 
-                (i > 0 ? '*' : ' '), version->id);
-        APPEND_STR(temp);
+        APPENDF("%c Vector ID: %lu\n", (i > 0 ? '*' : ' '), version->id);
 
         // Format model and timestamp
         time_t ts = (time_t)version->timestamp;
-        struct tm* tm_info = localtime(&ts);
+        struct tm tm_info;
         char time_str[32];
-        strftime(time_str, sizeof(time_str), "%Y-%m-%d %H:%M:%S", tm_info);
+        localtime_r(&ts, &tm_info);
+        strftime(time_str, sizeof(time_str), "%Y-%m-%d %H:%M:%S", &tm_info);
 
-        snprintf(temp, sizeof(temp), "%c  Model: %s\n", 
+        APPENDF("%c  Model: %s\n",
                 (i < version_count-1 ? '|' : ' '), version->model_version);
-        APPEND_STR(temp);
 
         // Format metadata
-        APPEND_STR(i < version_count-1 ? "|  Metadata: {" : "   Metadata: {");
+        APPENDF("%s", i < version_count-1 ? "|  Metadata: {" : "   Metadata: {");
         eb_metadata_t* meta = version->metadata;
         bool first = true;
         while (meta) {
-            snprintf(temp, sizeof(temp), "%s\"%s\": \"%s\"",
+            APPENDF("%s\"%s\": \"%s\"",
                     first ? "" : ", ", meta->key, meta->value);
-            APPEND_STR(temp);
             first = false;
             meta = meta->next;
         }
-        APPEND_STR("}\n");
+        APPENDF("}\n");
 
-        snprintf(temp, sizeof(temp), "%c  Timestamp: %s\n",
+        APPENDF("%c  Timestamp: %s\n",
                 (i < version_count-1 ? '|' : ' '), time_str);
-        APPEND_STR(temp);
 
         // Add comparison metrics if this isn't the first version
         if (i > 0 && i-1 < change_count) {
             const eb_comparison_result_t* change = &changes[i-1];
-            APPEND_STR("|\n");
-            
-            snprintf(temp, sizeof(temp), 
-                    "|  Semantic Preservation: %.0f%%\n",
+            APPENDF("|\n");
+            APPENDF("|  Semantic Preservation: %.0f%%\n",
                     change->semantic_preservation * 100);
-            APPEND_STR(temp);
-
-            snprintf(temp, sizeof(temp),
-                    "|  Cosine Similarity: %.2f\n",
+            APPENDF("|  Cosine Similarity: %.2f\n",
                     change->cosine_similarity);
-            APPEND_STR(temp);
-
-            APPEND_STR("|\n");
+            APPENDF("|\n");
         }
     }
 
-    #undef APPEND_STR
+    #undef APPENDF
 
     *out_formatted = buffer;
     *out_length = current_pos;
@@ -979,67 +1164,24 @@ eb_status_t eb_store_memory(
         return EB_ERROR_INVALID_INPUT;
     }
 
-    // Create a copy of the embedding
-    eb_embedding_t* embedding_copy;
-    eb_status_t status = eb_create_embedding(
-        embedding->values,
-        embedding->dimensions,
-        1,  // Single vector
-        EB_FLOAT32,
-        embedding->normalize,
-        &embedding_copy
-    );
-    if (status != EB_SUCCESS) {
-        return status;
-    }
-
-    // Create a copy of the metadata
-    eb_metadata_t* metadata_copy = NULL;
-    eb_metadata_t* last_meta = NULL;
-    const eb_metadata_t* meta = metadata;
-    
-    DEBUG_PRINT("DEBUG: Creating metadata copy\n");
-    DEBUG_PRINT("DEBUG: Initial metadata pointer: %p\n", (void*)metadata);
-    
-    while (meta) {
-        DEBUG_PRINT("DEBUG: Processing metadata key: %s, value: %s\n", meta->key, meta->value);
-        eb_metadata_t* new_meta;
-        status = eb_metadata_create(meta->key, meta->value, &new_meta);
-        if (status != EB_SUCCESS) {
-            DEBUG_PRINT("DEBUG: Failed to create metadata copy (status=%d)\n", status);
-            eb_destroy_embedding(embedding_copy);
-            eb_metadata_destroy(metadata_copy);
-            return status;
-        }
-        
-        if (!metadata_copy) {
-            metadata_copy = new_meta;
-        } else {
-            last_meta->next = new_meta;
-        }
-        last_meta = new_meta;
-        meta = meta->next;
-    }
-
     // Generate vector ID based on metadata and model version
     // This ensures same text gets same ID across versions
-    size_t hash_data_size = 0;
-    meta = metadata;
-    bool found_text = false;
+    const eb_metadata_t* meta = metadata;
+    const char* text = NULL;
     
     DEBUG_PRINT("DEBUG: Searching for text metadata\n");
     while (meta) {
         DEBUG_PRINT("DEBUG: Checking metadata key: %s\n", meta->key);
         if (strcmp(meta->key, "text") == 0) {  // Only use text for ID
-            hash_data_size = strlen(meta->value) + 1;
-            found_text = true;
-            DEBUG_PRINT("DEBUG: Found text metadata with length %zu\n", hash_data_size - 1);
+            text = meta->value;
+            DEBUG_PRINT("DEBUG: Found text metadata with length %zu\n", strlen(text));
             break;
         }
         meta = meta->next;
     }
 
-    if (!found_text) {
+    if (!text) {
+#ifdef EB_DEBUG_ENABLED
         DEBUG_PRINT("DEBUG: No text metadata found in keys: ");
         meta = metadata;
         while (meta) {
@@ -1047,49 +1189,81 @@ eb_status_t eb_store_memory(
             meta = meta->next;
         }
         DEBUG_PRINT("\n");
-        eb_destroy_embedding(embedding_copy);
-        eb_metadata_destroy(metadata_copy);
+#endif
         return EB_ERROR_INVALID_INPUT;
     }
 
-    char* hash_data = malloc(hash_data_size);
-    if (!hash_data) {
-        DEBUG_PRINT("DEBUG: Failed to allocate hash data\n");
-        eb_destroy_embedding(embedding_copy);
-        eb_metadata_destroy(metadata_copy);
-        return EB_ERROR_MEMORY_ALLOCATION;
-    }
-
-    // Use only the text for hashing to ensure same text gets same ID
-    meta = metadata;
-    while (meta) {
-        if (strcmp(meta->key, "text") == 0) {
-            strcpy(hash_data, meta->value);
-            break;
-        }
-        meta = meta->next;
-    }
-
-    // Generate ID from text only
-    *out_id = generate_id(hash_data, hash_data_size - 1);  // Exclude null terminator
-    free(hash_data);
+    // Generate ID from text only, hashing the metadata value in place
+    *out_id = generate_text_id(text);
 
     DEBUG_PRINT("DEBUG: Generated ID: %lu for text metadata\n", *out_id);
 
-    // Store using the regular function
+    // eb_store_vector copies what it keeps (or writes it to disk), so the
+    // caller's data is passed through as-is unless it still has to be
+    // normalized; the file path writes values verbatim under the flag
+    eb_embedding_t* normalized = NULL;
+    if (embedding->normalize) {
+        eb_status_t status = eb_create_embedding(
+            embedding->values,
+            embedding->dimensions,
+            1,  // Single vector
+            EB_FLOAT32,
+            true,
+            &normalized
+        );
+        if (status != EB_SUCCESS) return status;
+        embedding = normalized;
+    }
+
     DEBUG_PRINT("DEBUG: Storing vector\n");
-    status = eb_store_vector(
+    eb_status_t status = eb_store_vector(
         store,
-        embedding_copy,
-        metadata_copy,
+        embedding,
+        metadata,
         model_version,
         out_id
     );
     DEBUG_PRINT("DEBUG: Store vector result: %d\n", status);
 
+    eb_destroy_embedding(normalized);
     return status;
 }
 
+eb_status_t eb_store_memory_batch(
+    eb_store_t* store,
+    const float* embeddings,
+    size_t count,
+    size_t dimensions,
+    bool normalize,
+    const eb_metadata_t* const* metadata,
+    const char* const* model_versions,
+    uint64_t* out_ids
+) {
+    if (!store || !embeddings || !metadata || !model_versions || !out_ids || dimensions == 0) {
+        return EB_ERROR_INVALID_INPUT;
+    }
+
+    // Each row is wrapped in a stack embedding that points into the caller's
+    // block; eb_store_memory normalizes a copy when asked and copies what it
+    // keeps, so the caller's values are never modified
+    for (size_t i = 0; i < count; i++) {
+        eb_embedding_t row = {
+            .values = (float*)(embeddings + i * dimensions),
+            .dimensions = dimensions,
+            .normalize = normalize
+        };
+
+        eb_status_t status = eb_store_memory(
+            store, &row, metadata[i], model_versions[i], &out_ids[i]);
+        if (status != EB_SUCCESS) {
+            DEBUG_PRINT("eb_store_memory_batch: row %zu failed (status=%d)\n", i, status);
+            return status;
+        }
+    }
+
+    return EB_SUCCESS;
+}
+
 static __attribute__((unused)) size_t count_version_chain(eb_stored_vector_t* vector) {
     size_t count = 0;
     eb_stored_vector_t* current = vector;
@@ -1176,23 +1350,21 @@ eb_status_t eb_get_memory_evolution_with_changes(
         }
     }
 
-    // Sort chain by timestamp
-    for (size_t i = 0; i < chain_length - 1; i++) {
-        for (size_t j = 0; j < chain_length - i - 1; j++) {
-            if (chain[j]->timestamp > chain[j + 1]->timestamp) {
-                eb_stored_vector_t* temp = chain[j];
-                chain[j] = chain[j + 1];
-                chain[j + 1] = temp;
-            }
-        }
-    }
-
-    // Copy versions within time range
+    // Keep only versions within time range, then insertion-sort those by
+    // timestamp (stable, so equal timestamps keep their chain order)
     size_t version_count = 0;
     for (size_t i = 0; i < chain_length; i++) {
-        if (chain[i]->timestamp >= from_time && chain[i]->timestamp <= to_time) {
-            version_count++;
+        eb_stored_vector_t* candidate = chain[i];
+        if (candidate->timestamp < from_time || candidate->timestamp > to_time) {
+            continue;
         }
+
+        size_t j = version_count++;
+        while (j > 0 && chain[j - 1]->timestamp > candidate->timestamp) {
+            chain[j] = chain[j - 1];
+            j--;
+        }
+        chain[j] = candidate;
     }
 
     if (version_count == 0) {
@@ -1211,13 +1383,9 @@ eb_status_t eb_get_memory_evolution_with_changes(
         return EB_ERROR_MEMORY_ALLOCATION;
     }
 
-    size_t version_idx = 0;
-    for (size_t i = 0; i < chain_length; i++) {
-        if (chain[i]->timestamp >= from_time && chain[i]->timestamp <= to_time) {
-            versions[version_idx] = *chain[i];
-            versions[version_idx].model_version = strdup(chain[i]->model_version);
-            version_idx++;
-        }
+    for (size_t i = 0; i < version_count; i++) {
+        versions[i] = *chain[i];
+        versions[i].model_version = strdup(chain[i]->model_version);
     }
 
     // Compute changes between consecutive versions
@@ -1256,6 +1424,56 @@ eb_status_t eb_get_memory_evolution_with_changes(
     return EB_SUCCESS;
 }
 
+eb_status_t eb_flatten_stored_vectors(
+    const eb_stored_vector_t* versions,
+    size_t version_count,
+    eb_stored_vector_batch_t** out_batch
+) {
+    if (!versions || !out_batch || version_count == 0 || !versions[0].embedding) {
+        return EB_ERROR_INVALID_INPUT;
+    }
+
+    size_t dimensions = versions[0].embedding->dimensions;
+    for (size_t i = 1; i < version_count; i++) {
+        if (!versions[i].embedding) return EB_ERROR_INVALID_INPUT;
+        if (versions[i].embedding->dimensions != dimensions) {
+            return EB_ERROR_DIMENSION_MISMATCH;
+        }
+    }
+
+    eb_stored_vector_batch_t* batch = calloc(1, sizeof(eb_stored_vector_batch_t));
+    if (!batch) return EB_ERROR_MEMORY_ALLOCATION;
+
+    batch->data = malloc(version_count * dimensions * sizeof(float));
+    batch->ids = malloc(version_count * sizeof(uint64_t));
+    batch->timestamps = malloc(version_count * sizeof(uint64_t));
+    if (!batch->data || !batch->ids || !batch->timestamps) {
+        eb_destroy_stored_vector_batch(batch);
+        return EB_ERROR_MEMORY_ALLOCATION;
+    }
+
+    // One copy per row; everything after this walks contiguous memory
+    for (size_t i = 0; i < version_count; i++) {
+        memcpy(batch->data + i * dimensions, versions[i].embedding->values,
+               dimensions * sizeof(float));
+        batch->ids[i] = versions[i].id;
+        batch->timestamps[i] = versions[i].timestamp;
+    }
+    batch->count = version_count;
+    batch->dimensions = dimensions;
+
+    *out_batch = batch;
+    return EB_SUCCESS;
+}
+
+void eb_destroy_stored_vector_batch(eb_stored_vector_batch_t* batch) {
+    if (!batch) return;
+    free(batch->data);
+    free(batch->ids);
+    free(batch->timestamps);
+    free(batch);
+}
+
 void eb_metadata_append(eb_metadata_t* metadata, eb_metadata_t* next) {
     if (!metadata) return;
     metadata->next = next;
@@ -1529,18 +1747,18 @@ eb_status_t eb_store_vector_memory(
     // Generate ID from embedding data if no text
     if (!text) {
         DEBUG_PRINT("DEBUG: No text found in metadata, using embedding data for ID\n");
-        *out_id = generate_id(embedding->values, embedding->dimensions * sizeof(float));
+        *out_id = generate_id(embedding->values, embedding->dimensions);
     } else {
         // If we have a parent_id, use it directly
         if (parent_id != 0) {
-            *out_id = generate_id(text, strlen(text));
+            *out_id = generate_text_id(text);
         } else {
             // Find existing vector with same text
             eb_stored_vector_t* existing = find_vector_by_text(store, text);
             if (existing) {
                 parent_id = existing->id;
             }
-            *out_id = generate_id(text, strlen(text));
+            *out_id = generate_text_id(text);
         }
     }
     
@@ -1914,6 +2132,28 @@ eb_status_t get_current_hash(const char* root, const char* source, char* hash_ou
     return found ? EB_SUCCESS : EB_ERROR_NOT_FOUND;
 }
 
+/*
+ * HEAD normally holds only the current set name. It needs rewriting only
+ * when it still carries legacy "ref:" lines or has no set name at all.
+ * Leaves the stream rewound for the caller.
+ */
+static bool head_needs_rewrite(FILE *head_fp) {
+    char line[MAX_LINE_LEN];
+    bool has_set_name = false;
+    bool has_refs = false;
+
+    while (fgets(line, sizeof(line), head_fp)) {
+        line[strcspn(line, "\n")] = 0;
+        if (strncmp(line, "ref:", 4) == 0)
+            has_refs = true;
+        else if (line[0] != '{' && line[0] != '\0')
+            has_set_name = true;
+    }
+    rewind(head_fp);
+
+    return has_refs || !has_set_name;
+}
+
 static int mkdir_p(const char *path) {
     char tmp[PATH_MAX];
     char *p = NULL;
@@ -2007,9 +2247,11 @@ eb_status_t store_embedding_file(const char* embedding_path, const char* source_
 
     // Store metadata
     char meta_path[PATH_MAX];
+    char meta_tmp_path[PATH_MAX + 4];
     // Use the same hash but with .meta extension instead of .raw
     snprintf(meta_path, sizeof(meta_path), "%s/%s.meta", objects_dir, hash_str);
-    fp = fopen(meta_path, "w");
+    snprintf(meta_tmp_path, sizeof(meta_tmp_path), "%s.tmp", meta_path);
+    fp = fopen(meta_tmp_path, "w");
     if (!fp) {
         return EB_ERROR_FILE_IO;
     }
@@ -2019,7 +2261,10 @@ eb_status_t store_embedding_file(const char* embedding_path, const char* source_
     fprintf(fp, "timestamp=%ld\n", now);
     fprintf(fp, "file_type=%s\n", strrchr(embedding_path, '.') + 1);
     fprintf(fp, "model=%s\n", provider ? provider : "unknown");  // Use provided model
-    fclose(fp);
+    if (fclose(fp) != 0 || rename(meta_tmp_path, meta_path) != 0) {
+        unlink(meta_tmp_path);
+        return EB_ERROR_FILE_IO;
+    }
 
     // Update index - read existing index, filter out old entries for same file+model, then write back
     char* index_path = get_current_set_index_path();
@@ -2144,8 +2389,11 @@ eb_status_t store_embedding_file(const char* embedding_path, const char* source_
             fclose(model_read_fp);
         }
         
-        // Write updated model reference file
-        FILE* model_fp = fopen(model_ref_path, "w");
+        // Write updated model reference file next to the old one and
+        // swap it in, so readers never see a truncated file
+        char model_tmp_path[PATH_MAX + 4];
+        snprintf(model_tmp_path, sizeof(model_tmp_path), "%s.tmp", model_ref_path);
+        FILE* model_fp = fopen(model_tmp_path, "w");
         if (!model_fp) {
             fprintf(stderr, "Warning: Failed to create model reference file for %s\n", provider);
             
@@ -2164,7 +2412,12 @@ eb_status_t store_embedding_file(const char* embedding_path, const char* source_
             
             // Add the new file entry
             fprintf(model_fp, "%s %s\n", hash_str, source_file);
-            fclose(model_fp);
+
+            // Only swap in the new file if every write reached it
+            if (fclose(model_fp) != 0 || rename(model_tmp_path, model_ref_path) != 0) {
+                fprintf(stderr, "Warning: Failed to update model reference file for %s\n", provider);
+                unlink(model_tmp_path);
+            }
         }
     }
     if (model_refs_dir) free(model_refs_dir);
@@ -2181,7 +2434,10 @@ eb_status_t store_embedding_file(const char* embedding_path, const char* source_
     
     // Open HEAD file for reading
     head_fp = fopen(head_path, "r");
-    if (head_fp) {
+    if (head_fp && !head_needs_rewrite(head_fp)) {
+        // HEAD already holds just the set name; nothing to write
+        fclose(head_fp);
+    } else if (head_fp) {
         // Create temp file for writing
         temp_fp = fopen(temp_path, "w");
         if (!temp_fp) {
@@ -21,6 +21,7 @@ eb_status_t eb_decompress_zstd(const void *source, size_t source_size, void **de
 
 // Object flags
 #define EB_FLAG_COMPRESSED 0x01  // Object is compressed with ZSTD
+#define EB_FLAG_EXACT_HASH 0x02  // Vector hash covers exactly the object bytes
 
 // START OF SET THE VERSION HERE
 // Version components
@@ -48,7 +49,8 @@ typedef enum {
     EB_FLOAT32,
     EB_FLOAT64,
     EB_INT32,
-    EB_INT64
+    EB_INT64,
+    EB_FLOAT16  // IEEE 754 half precision, widened to float32 on load
 } eb_dtype_t;
 
 // Compact binary metadata header
@@ -97,6 +99,15 @@ typedef struct eb_stored_vector {
     struct eb_stored_vector* next;  // Next version in chain
 } eb_stored_vector_t;
 
+// Struct-of-arrays view of stored vectors, so scans stream over contiguous data
+typedef struct {
+    float* data;            // count x dimensions, row-major
+    uint64_t* ids;          // Vector IDs
+    uint64_t* timestamps;   // Storage timestamps
+    size_t count;           // Number of vectors
+    size_t dimensions;      // Dimensions per vector
+} eb_stored_vector_batch_t;
+
 typedef struct {
     char* root_path;        // Path to .embr directory
     bool compression;       // Whether to compress objects
@@ -137,6 +148,17 @@ void eb_destroy_embedding(eb_embedding_t* embedding);
 
 // Metadata functions
 eb_status_t eb_metadata_create(const char* key, const char* value, eb_metadata_t** out);
+eb_status_t eb_metadata_create_batch(
+    const char* const* keys,
+    const char* const* values,
+    size_t count,
+    eb_metadata_t** out
+);
+eb_status_t eb_metadata_to_json(
+    const eb_metadata_t* head,
+    char** out_json,
+    size_t* out_len
+);
 void eb_metadata_destroy(eb_metadata_t* metadata);
 
 // Comparison functions
@@ -172,6 +194,22 @@ eb_status_t eb_format_evolution(
     size_t* out_length
 );
 
+// Flatten stored vectors (all of the same dimension) into one contiguous batch
+eb_status_t eb_flatten_stored_vectors(
+    const eb_stored_vector_t* versions,
+    size_t version_count,
+    eb_stored_vector_batch_t** out_batch
+);
+void eb_destroy_stored_vector_batch(eb_stored_vector_batch_t* batch);
+
+// Serialize each version's metadata as one JSON array of objects
+eb_status_t eb_metadata_list_to_json_array(
+    const eb_stored_vector_t* versions,
+    size_t count,
+    char** out_json,
+    size_t* out_len
+);
+
 // Vector operations
 eb_status_t eb_compute_cosine_similarity(
     const eb_embedding_t* a,
@@ -211,6 +249,19 @@ eb_status_t eb_store_memory(
     uint64_t* out_id
 );
 
+// Store n row-major vectors of the given dimension; stops at the first failure,
+// leaving out_ids filled for the rows stored before it
+eb_status_t eb_store_memory_batch(
+    eb_store_t* store,
+    const float* embeddings,
+    size_t count,
+    size_t dimensions,
+    bool normalize,
+    const eb_metadata_t* const* metadata,
+    const char* const* model_versions,
+    uint64_t* out_ids
+);
+
 eb_status_t eb_get_memory_evolution_with_changes(
     eb_store_t* store,
     uint64_t vector_id,
@@ -0,0 +1,114 @@
+/*
+ * EmbeddingBridge - Embedding Data Type Conversion Tests
+ * Copyright (C) 2024 ProgramComputer
+ *
+ * This program is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <math.h>
+#include <assert.h>
+#include "types.h"
+#include "embedding.h"
+
+/* Convert a single half-precision value through eb_create_embedding */
+static float convert_half(uint16_t half) {
+    eb_embedding_t* embedding = NULL;
+    eb_status_t status = eb_create_embedding(&half, 1, 1, EB_FLOAT16, false, &embedding);
+    assert(status == EB_SUCCESS);
+    assert(embedding != NULL);
+    assert(embedding->dimensions == 1);
+
+    float value = embedding->values[0];
+    eb_destroy_embedding(embedding);
+    return value;
+}
+
+/* Test the dtype size table */
+static void test_float16_size(void) {
+    printf("Testing float16 dtype size...\n");
+
+    assert(eb_get_dtype_size(EB_FLOAT16) == 2);
+    assert(eb_get_dtype_size(EB_FLOAT32) == 4);
+
+    printf("Float16 dtype size tests passed!\n");
+}
+
+/* Test normal, extreme and subnormal values */
+static void test_float16_values(void) {
+    printf("Testing float16 value conversion...\n");
+
+    assert(convert_half(0x3c00) == 1.0f);
+    assert(convert_half(0xc000) == -2.0f);
+    assert(convert_half(0x3555) == 0.333251953125f);
+
+    /* Largest finite half */
+    assert(convert_half(0x7bff) == 65504.0f);
+
+    /* Smallest normal half: 2^-14 */
+    assert(convert_half(0x0400) == ldexpf(1.0f, -14));
+
+    /* Subnormals: smallest (2^-24) and largest (1023 * 2^-24) */
+    assert(convert_half(0x0001) == ldexpf(1.0f, -24));
+    assert(convert_half(0x03ff) == ldexpf(1023.0f, -24));
+    assert(convert_half(0x8001) == -ldexpf(1.0f, -24));
+
+    printf("Float16 value conversion tests passed!\n");
+}
+
+/* Test signed zeros, infinities and NaN */
+static void test_float16_special(void) {
+    printf("Testing float16 special values...\n");
+
+    float zero = convert_half(0x0000);
+    assert(zero == 0.0f && !signbit(zero));
+
+    float negative_zero = convert_half(0x8000);
+    assert(negative_zero == 0.0f && signbit(negative_zero));
+
+    float inf = convert_half(0x7c00);
+    assert(isinf(inf) && inf > 0);
+
+    float negative_inf = convert_half(0xfc00);
+    assert(isinf(negative_inf) && negative_inf < 0);
+
+    assert(isnan(convert_half(0x7e00)));
+    assert(isnan(convert_half(0xfc01)));
+
+    printf("Float16 special value tests passed!\n");
+}
+
+/* Test a multi-element float16 vector with normalization */
+static void test_float16_vector(void) {
+    printf("Testing float16 vector conversion...\n");
+
+    /* 3.0, 4.0 normalizes to 0.6, 0.8 */
+    uint16_t halves[] = { 0x4200, 0x4400 };
+    eb_embedding_t* embedding = NULL;
+    eb_status_t status = eb_create_embedding(halves, 2, 1, EB_FLOAT16, true, &embedding);
+    assert(status == EB_SUCCESS);
+    assert(embedding->dimensions == 2);
+    assert(fabsf(embedding->values[0] - 0.6f) < 1e-6f);
+    assert(fabsf(embedding->values[1] - 0.8f) < 1e-6f);
+    eb_destroy_embedding(embedding);
+
+    printf("Float16 vector conversion tests passed!\n");
+}
+
+int main(void) {
+    printf("=== Embedding Data Type Tests ===\n");
+
+    test_float16_size();
+    test_float16_values();
+    test_float16_special();
+    test_float16_vector();
+
+    printf("All embedding data type tests passed!\n");
+    return 0;
+}
@@ -0,0 +1,541 @@
+/*
+ * EmbeddingBridge - Store Helper Tests
+ * Copyright (C) 2024 ProgramComputer
+ *
+ * This program is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <math.h>
+#include <assert.h>
+#include <dirent.h>
+#include "types.h"
+#include "store.h"
+
+/* File-backed store used by the on-disk tests */
+#define TEST_STORE_DIR "testdata/store_helpers"
+
+/* Test flattening versions into one contiguous batch */
+static void test_flatten_stored_vectors(void) {
+    printf("Testing stored vector flattening...\n");
+
+    float a[] = { 1.0f, 2.0f, 3.0f };
+    float b[] = { 4.0f, 5.0f, 6.0f };
+    eb_embedding_t emb_a = { .values = a, .dimensions = 3 };
+    eb_embedding_t emb_b = { .values = b, .dimensions = 3 };
+    eb_stored_vector_t versions[] = {
+        { .id = 11, .embedding = &emb_a, .timestamp = 100 },
+        { .id = 12, .embedding = &emb_b, .timestamp = 200 },
+    };
+
+    eb_stored_vector_batch_t* batch = NULL;
+    eb_status_t status = eb_flatten_stored_vectors(versions, 2, &batch);
+    assert(status == EB_SUCCESS);
+    assert(batch != NULL);
+    assert(batch->count == 2);
+    assert(batch->dimensions == 3);
+    assert(memcmp(batch->data, a, sizeof(a)) == 0);
+    assert(memcmp(batch->data + 3, b, sizeof(b)) == 0);
+    assert(batch->ids[0] == 11 && batch->ids[1] == 12);
+    assert(batch->timestamps[0] == 100 && batch->timestamps[1] == 200);
+    eb_destroy_stored_vector_batch(batch);
+
+    printf("Stored vector flattening tests passed!\n");
+}
+
+/* Test flattening error paths */
+static void test_flatten_stored_vectors_errors(void) {
+    printf("Testing stored vector flattening errors...\n");
+
+    float a[] = { 1.0f, 2.0f, 3.0f };
+    float b[] = { 4.0f, 5.0f };
+    eb_embedding_t emb_a = { .values = a, .dimensions = 3 };
+    eb_embedding_t emb_b = { .values = b, .dimensions = 2 };
+    eb_stored_vector_batch_t* batch = NULL;
+
+    /* Rows of different dimensions */
+    eb_stored_vector_t mismatched[] = {
+        { .id = 1, .embedding = &emb_a },
+        { .id = 2, .embedding = &emb_b },
+    };
+    assert(eb_flatten_stored_vectors(mismatched, 2, &batch) == EB_ERROR_DIMENSION_MISMATCH);
+    assert(batch == NULL);
+
+    /* Missing embedding on the first and on a later row */
+    eb_stored_vector_t first_missing[] = {
+        { .id = 1, .embedding = NULL },
+        { .id = 2, .embedding = &emb_a },
+    };
+    assert(eb_flatten_stored_vectors(first_missing, 2, &batch) == EB_ERROR_INVALID_INPUT);
+
+    eb_stored_vector_t later_missing[] = {
+        { .id = 1, .embedding = &emb_a },
+        { .id = 2, .embedding = NULL },
+    };
+    assert(eb_flatten_stored_vectors(later_missing, 2, &batch) == EB_ERROR_INVALID_INPUT);
+    assert(batch == NULL);
+
+    /* Empty and NULL inputs */
+    assert(eb_flatten_stored_vectors(mismatched, 0, &batch) == EB_ERROR_INVALID_INPUT);
+    assert(eb_flatten_stored_vectors(NULL, 2, &batch) == EB_ERROR_INVALID_INPUT);
+    assert(eb_flatten_stored_vectors(mismatched, 1, NULL) == EB_ERROR_INVALID_INPUT);
+
+    /* Destroying NULL is a no-op */
+    eb_destroy_stored_vector_batch(NULL);
+
+    printf("Stored vector flattening error tests passed!\n");
+}
+
+/* Test building a metadata list from parallel key/value arrays */
+static void test_metadata_create_batch(void) {
+    printf("Testing batch metadata creation...\n");
+
+    const char* keys[] = { "text", "source", "lang" };
+    const char* values[] = { "hello", "doc.txt", "en" };
+    eb_metadata_t* head = NULL;
+
+    eb_status_t status = eb_metadata_create_batch(keys, values, 3, &head);
+    assert(status == EB_SUCCESS);
+
+    /* Nodes are linked in input order and the list ends after the last one */
+    eb_metadata_t* meta = head;
+    for (size_t i = 0; i < 3; i++) {
+        assert(meta != NULL);
+        assert(strcmp(meta->key, keys[i]) == 0);
+        assert(strcmp(meta->value, values[i]) == 0);
+        meta = meta->next;
+    }
+    assert(meta == NULL);
+    eb_metadata_destroy(head);
+
+    /* An empty batch is an empty list */
+    head = NULL;
+    assert(eb_metadata_create_batch(keys, values, 0, &head) == EB_SUCCESS);
+    assert(head == NULL);
+
+    printf("Batch metadata creation tests passed!\n");
+}
+
+/* Test that a NULL entry fails and frees the nodes built before it */
+static void test_metadata_create_batch_errors(void) {
+    printf("Testing batch metadata creation errors...\n");
+
+    const char* keys[] = { "text", "source", NULL };
+    const char* values[] = { "hello", NULL, "en" };
+    eb_metadata_t* head = NULL;
+
+    /* NULL value on the second entry, NULL key on the third */
+    assert(eb_metadata_create_batch(keys, values, 2, &head) == EB_ERROR_INVALID_INPUT);
+    assert(head == NULL);
+
+    const char* good_values[] = { "hello", "doc.txt", "en" };
+    assert(eb_metadata_create_batch(keys, good_values, 3, &head) == EB_ERROR_INVALID_INPUT);
+    assert(head == NULL);
+
+    assert(eb_metadata_create_batch(NULL, values, 1, &head) == EB_ERROR_INVALID_INPUT);
+    assert(eb_metadata_create_batch(keys, NULL, 1, &head) == EB_ERROR_INVALID_INPUT);
+    assert(eb_metadata_create_batch(keys, values, 1, NULL) == EB_ERROR_INVALID_INPUT);
+
+    printf("Batch metadata creation error tests passed!\n");
+}
+
+/* Fetch the stored version of a vector from a memory store */
+static eb_stored_vector_t* find_stored(eb_store_t* store, uint64_t id) {
+    eb_stored_vector_t* versions = NULL;
+    eb_comparison_result_t* changes = NULL;
+    size_t version_count = 0;
+    size_t change_count = 0;
+    eb_status_t status = eb_get_memory_evolution_with_changes(
+        store, id, 0, UINT64_MAX,
+        &versions, &version_count, &changes, &change_count);
+    assert(status == EB_SUCCESS);
+    assert(version_count == 1);
+    free(changes);
+    return versions;
+}
+
+/* Free a version returned by find_stored */
+static void free_stored(eb_stored_vector_t* stored) {
+    free(stored->model_version);
+    free(stored);
+}
+
+/* Test storing several rows of one contiguous block */
+static void test_store_memory_batch(void) {
+    printf("Testing batch memory store...\n");
+
+    eb_store_t* store = NULL;
+    assert(eb_store_init_memory(&store) == EB_SUCCESS);
+
+    float rows[] = { 3.0f, 4.0f,
+                     0.0f, 2.0f };
+    eb_metadata_t meta_b = { .key = "text", .value = "second" };
+    eb_metadata_t meta_a = { .key = "text", .value = "first" };
+    const eb_metadata_t* metadata[] = { &meta_a, &meta_b };
+    const char* models[] = { "model-a", "model-b" };
+    uint64_t ids[2] = { 0, 0 };
+
+    eb_status_t status = eb_store_memory_batch(store, rows, 2, 2, false, metadata, models, ids);
+    assert(status == EB_SUCCESS);
+    assert(ids[0] != 0 && ids[1] != 0 && ids[0] != ids[1]);
+
+    /* Each row is stored under its own ID with its own model and values */
+    eb_stored_vector_t* stored = find_stored(store, ids[1]);
+    assert(strcmp(stored->model_version, "model-b") == 0);
+    assert(stored->embedding->dimensions == 2);
+    assert(stored->embedding->values[0] == 0.0f && stored->embedding->values[1] == 2.0f);
+    free_stored(stored);
+
+    /* The same text always maps to the same ID */
+    uint64_t single_id = 0;
+    eb_embedding_t single = { .values = rows, .dimensions = 2 };
+    assert(eb_store_memory(store, &single, &meta_a, "model-a", &single_id) == EB_SUCCESS);
+    assert(single_id == ids[0]);
+
+    eb_store_destroy(store);
+
+    /* The normalize flag is carried onto every row */
+    assert(eb_store_init_memory(&store) == EB_SUCCESS);
+    status = eb_store_memory_batch(store, rows, 2, 2, true, metadata, models, ids);
+    assert(status == EB_SUCCESS);
+
+    stored = find_stored(store, ids[0]);
+    assert(stored->embedding->normalize);
+    assert(fabsf(stored->embedding->values[0] - 0.6f) < 1e-6f);
+    assert(fabsf(stored->embedding->values[1] - 0.8f) < 1e-6f);
+    free_stored(stored);
+
+    stored = find_stored(store, ids[1]);
+    assert(stored->embedding->normalize);
+    assert(stored->embedding->values[1] == 1.0f);
+    free_stored(stored);
+
+    eb_store_destroy(store);
+
+    printf("Batch memory store tests passed!\n");
+}
+
+/* Test that the batch stops at the first failing row */
+static void test_store_memory_batch_errors(void) {
+    printf("Testing batch memory store errors...\n");
+
+    eb_store_t* store = NULL;
+    assert(eb_store_init_memory(&store) == EB_SUCCESS);
+
+    float rows[] = { 1.0f, 0.0f,
+                     0.0f, 1.0f,
+                     1.0f, 1.0f };
+    eb_metadata_t meta_a = { .key = "text", .value = "first" };
+    eb_metadata_t meta_b = { .key = "source", .value = "no-text.txt" };
+    eb_metadata_t meta_c = { .key = "text", .value = "third" };
+    const eb_metadata_t* metadata[] = { &meta_a, &meta_b, &meta_c };
+    const char* models[] = { "model", "model", "model" };
+    uint64_t ids[3] = { 0, 0, 0 };
+
+    /* Row 1 has no "text" metadata: row 0 is stored, rows 1 and 2 are not */
+    eb_status_t status = eb_store_memory_batch(store, rows, 3, 2, false, metadata, models, ids);
+    assert(status == EB_ERROR_INVALID_INPUT);
+    assert(ids[0] != 0);
+    assert(ids[1] == 0 && ids[2] == 0);
+    assert(store->vector_count == 1);
+
+    /* Missing arguments and zero dimensions are rejected up front */
+    assert(eb_store_memory_batch(NULL, rows, 1, 2, false, metadata, models, ids) == EB_ERROR_INVALID_INPUT);
+    assert(eb_store_memory_batch(store, NULL, 1, 2, false, metadata, models, ids) == EB_ERROR_INVALID_INPUT);
+    assert(eb_store_memory_batch(store, rows, 1, 0, false, metadata, models, ids) == EB_ERROR_INVALID_INPUT);
+    assert(eb_store_memory_batch(store, rows, 1, 2, false, NULL, models, ids) == EB_ERROR_INVALID_INPUT);
+    assert(eb_store_memory_batch(store, rows, 1, 2, false, metadata, NULL, ids) == EB_ERROR_INVALID_INPUT);
+    assert(eb_store_memory_batch(store, rows, 1, 2, false, metadata, models, NULL) == EB_ERROR_INVALID_INPUT);
+
+    /* An empty batch stores nothing */
+    assert(eb_store_memory_batch(store, rows, 0, 2, false, metadata, models, ids) == EB_SUCCESS);
+    assert(store->vector_count == 1);
+
+    eb_store_destroy(store);
+
+    printf("Batch memory store error tests passed!\n");
+}
+
+/* Create an empty file-backed store under TEST_STORE_DIR */
+static eb_store_t* open_file_store(void) {
+    system("rm -rf " TEST_STORE_DIR);
+    system("mkdir -p " TEST_STORE_DIR "/.embr/objects/temp "
+           TEST_STORE_DIR "/.embr/metadata/files "
+           TEST_STORE_DIR "/.embr/metadata/models "
+           TEST_STORE_DIR "/.embr/metadata/versions");
+
+    eb_store_config_t config = { .root_path = TEST_STORE_DIR };
+    eb_store_t* store = NULL;
+    assert(eb_store_init(&config, &store) == EB_SUCCESS);
+    return store;
+}
+
+/* Close a file-backed store and remove its directory */
+static void close_file_store(eb_store_t* store) {
+    eb_store_destroy(store);
+    system("rm -rf " TEST_STORE_DIR);
+}
+
+/*
+ * Find the vector object whose hash starts with the given ID, read it back
+ * through read_object (which verifies its hash) and copy out its values
+ */
+static void read_stored_object(eb_store_t* store, uint64_t id, float* out, size_t dimensions) {
+    DIR* dir = opendir(TEST_STORE_DIR "/.embr/objects");
+    assert(dir != NULL);
+
+    bool found = false;
+    struct dirent* entry;
+    while ((entry = readdir(dir)) != NULL) {
+        char hex_hash[65];
+        if (strlen(entry->d_name) != 68 || strcmp(entry->d_name + 64, ".raw") != 0) continue;
+        memcpy(hex_hash, entry->d_name, 64);
+        hex_hash[64] = '\0';
+
+        uint8_t prefix[8];
+        for (size_t i = 0; i < sizeof(prefix); i++) {
+            sscanf(hex_hash + i * 2, "%2hhx", &prefix[i]);
+        }
+        uint64_t object_id;
+        memcpy(&object_id, prefix, sizeof(object_id));
+        if (object_id != id) continue;
+
+        void* data = NULL;
+        size_t size = 0;
+        eb_object_header_t header;
+        assert(read_object(store, hex_hash, &data, &size, &header) == EB_SUCCESS);
+        assert(header.obj_type == EB_OBJ_VECTOR);
+        assert(header.flags & EB_FLAG_EXACT_HASH);
+        assert(size == dimensions * sizeof(float));
+        memcpy(out, data, size);
+        free(data);
+        found = true;
+    }
+    closedir(dir);
+    assert(found);
+}
+
+/* Test that the file store writes normalized values and verifiable objects */
+static void test_store_memory_file(void) {
+    printf("Testing file-backed memory store...\n");
+
+    eb_store_t* store = open_file_store();
+
+    float values[] = { 3.0f, 4.0f };
+    eb_metadata_t source = { .key = "source", .value = "doc.txt" };
+    eb_metadata_t text = { .key = "text", .value = "hello", .next = &source };
+    float stored[2];
+
+    /* Normalized input is written as a unit vector; the caller's data is untouched */
+    eb_embedding_t normalized = { .values = values, .dimensions = 2, .normalize = true };
+    uint64_t id = 0;
+    assert(eb_store_memory(store, &normalized, &text, "model", &id) == EB_SUCCESS);
+    assert(values[0] == 3.0f && values[1] == 4.0f);
+    read_stored_object(store, id, stored, 2);
+    assert(fabsf(stored[0] - 0.6f) < 1e-6f);
+    assert(fabsf(stored[1] - 0.8f) < 1e-6f);
+
+    /* Raw input is written as-is */
+    eb_embedding_t raw = { .values = values, .dimensions = 2, .normalize = false };
+    assert(eb_store_memory(store, &raw, &text, "model", &id) == EB_SUCCESS);
+    read_stored_object(store, id, stored, 2);
+    assert(stored[0] == 3.0f && stored[1] == 4.0f);
+
+    close_file_store(store);
+
+    printf("File-backed memory store tests passed!\n");
+}
+
+/* Test that batch rows written to a file store are normalized on disk */
+static void test_store_memory_batch_file(void) {
+    printf("Testing file-backed batch memory store...\n");
+
+    eb_store_t* store = open_file_store();
+
+    float rows[] = { 3.0f, 4.0f,
+                     0.0f, 2.0f };
+    eb_metadata_t source_b = { .key = "source", .value = "b.txt" };
+    eb_metadata_t meta_b = { .key = "text", .value = "second", .next = &source_b };
+    eb_metadata_t source_a = { .key = "source", .value = "a.txt" };
+    eb_metadata_t meta_a = { .key = "text", .value = "first", .next = &source_a };
+    const eb_metadata_t* metadata[] = { &meta_a, &meta_b };
+    const char* models[] = { "model", "model" };
+    uint64_t ids[2] = { 0, 0 };
+    float stored[2];
+
+    eb_status_t status = eb_store_memory_batch(store, rows, 2, 2, true, metadata, models, ids);
+    assert(status == EB_SUCCESS);
+
+    /* The caller's block is left as it was */
+    assert(rows[0] == 3.0f && rows[1] == 4.0f && rows[3] == 2.0f);
+
+    read_stored_object(store, ids[0], stored, 2);
+    assert(fabsf(stored[0] - 0.6f) < 1e-6f);
+    assert(fabsf(stored[1] - 0.8f) < 1e-6f);
+
+    read_stored_object(store, ids[1], stored, 2);
+    assert(stored[0] == 0.0f && stored[1] == 1.0f);
+
+    close_file_store(store);
+
+    printf("File-backed batch memory store tests passed!\n");
+}
+
+/* Serialize a metadata list and check the exact JSON text */
+static void assert_metadata_json(const eb_metadata_t* head, const char* expected) {
+    char* json = NULL;
+    size_t len = 0;
+    eb_status_t status = eb_metadata_to_json(head, &json, &len);
+    assert(status == EB_SUCCESS);
+    assert(json != NULL);
+    assert(strcmp(json, expected) == 0);
+    assert(len == strlen(expected));
+    free(json);
+}
+
+/* Test JSON serialization of a metadata list */
+static void test_metadata_to_json(void) {
+    printf("Testing metadata JSON serialization...\n");
+
+    /* Empty list */
+    assert_metadata_json(NULL, "{}");
+
+    /* Pairs come out in list order */
+    eb_metadata_t lang = { .key = "lang", .value = "en" };
+    eb_metadata_t text = { .key = "text", .value = "hello", .next = &lang };
+    assert_metadata_json(&text, "{\"text\":\"hello\",\"lang\":\"en\"}");
+
+    /* Quotes and backslashes in keys and values */
+    eb_metadata_t quoted = { .key = "say \"hi\"", .value = "C:\\dir\\" };
+    assert_metadata_json(&quoted, "{\"say \\\"hi\\\"\":\"C:\\\\dir\\\\\"}");
+
+    /* Short escapes and \u00XX for the remaining control characters */
+    eb_metadata_t control = { .key = "c", .value = "a\nb\tc\r\b\f\x01\x1f" };
+    assert_metadata_json(&control, "{\"c\":\"a\\nb\\tc\\r\\b\\f\\u0001\\u001f\"}");
+
+    /* Non-ASCII UTF-8 and empty strings pass through unchanged */
+    eb_metadata_t utf8 = { .key = "", .value = "caf\xc3\xa9" };
+    assert_metadata_json(&utf8, "{\"\":\"caf\xc3\xa9\"}");
+
+    /* out_len is optional */
+    char* json = NULL;
+    assert(eb_metadata_to_json(&lang, &json, NULL) == EB_SUCCESS);
+    assert(strcmp(json, "{\"lang\":\"en\"}") == 0);
+    free(json);
+
+    printf("Metadata JSON serialization tests passed!\n");
+}
+
+/* Test that incomplete nodes are rejected without output */
+static void test_metadata_to_json_errors(void) {
+    printf("Testing metadata JSON serialization errors...\n");
+
+    char* json = NULL;
+    size_t len = 0;
+
+    eb_metadata_t no_key = { .key = NULL, .value = "v" };
+    eb_metadata_t head = { .key = "text", .value = "hello", .next = &no_key };
+    assert(eb_metadata_to_json(&head, &json, &len) == EB_ERROR_INVALID_INPUT);
+    assert(json == NULL);
+
+    eb_metadata_t no_value = { .key = "k", .value = NULL };
+    assert(eb_metadata_to_json(&no_value, &json, &len) == EB_ERROR_INVALID_INPUT);
+    assert(json == NULL);
+
+    assert(eb_metadata_to_json(&head, NULL, &len) == EB_ERROR_INVALID_INPUT);
+
+    printf("Metadata JSON serialization error tests passed!\n");
+}
+
+/* Serialize the metadata of a version list and check the exact JSON text */
+static void assert_metadata_list_json(const eb_stored_vector_t* versions, size_t count,
+                                      const char* expected) {
+    char* json = NULL;
+    size_t len = 0;
+    eb_status_t status = eb_metadata_list_to_json_array(versions, count, &json, &len);
+    assert(status == EB_SUCCESS);
+    assert(json != NULL);
+    assert(strcmp(json, expected) == 0);
+    assert(len == strlen(expected));
+    free(json);
+}
+
+/* Test JSON serialization of a whole version history's metadata */
+static void test_metadata_list_to_json_array(void) {
+    printf("Testing metadata list JSON serialization...\n");
+
+    eb_metadata_t source = { .key = "source", .value = "a.txt" };
+    eb_metadata_t text = { .key = "text", .value = "say \"hi\"", .next = &source };
+    eb_metadata_t lang = { .key = "lang", .value = "en" };
+    eb_stored_vector_t versions[] = {
+        { .id = 1, .metadata = &text },
+        { .id = 2, .metadata = NULL },
+        { .id = 3, .metadata = &lang },
+    };
+
+    /* No versions */
+    assert_metadata_list_json(versions, 0, "[]");
+    assert_metadata_list_json(NULL, 0, "[]");
+
+    /* One version */
+    assert_metadata_list_json(versions + 2, 1, "[{\"lang\":\"en\"}]");
+
+    /* Several versions, one per element, with NULL metadata as an empty object */
+    assert_metadata_list_json(versions, 3,
+        "[{\"text\":\"say \\\"hi\\\"\",\"source\":\"a.txt\"},{},{\"lang\":\"en\"}]");
+
+    /* out_len is optional */
+    char* json = NULL;
+    assert(eb_metadata_list_to_json_array(versions + 1, 1, &json, NULL) == EB_SUCCESS);
+    assert(strcmp(json, "[{}]") == 0);
+    free(json);
+
+    printf("Metadata list JSON serialization tests passed!\n");
+}
+
+/* Test that invalid version lists are rejected without output */
+static void test_metadata_list_to_json_array_errors(void) {
+    printf("Testing metadata list JSON serialization errors...\n");
+
+    char* json = NULL;
+    size_t len = 0;
+
+    eb_metadata_t no_key = { .key = NULL, .value = "v" };
+    eb_stored_vector_t versions[] = {
+        { .id = 1, .metadata = NULL },
+        { .id = 2, .metadata = &no_key },
+    };
+    assert(eb_metadata_list_to_json_array(versions, 2, &json, &len) == EB_ERROR_INVALID_INPUT);
+    assert(json == NULL);
+
+    assert(eb_metadata_list_to_json_array(NULL, 1, &json, &len) == EB_ERROR_INVALID_INPUT);
+    assert(eb_metadata_list_to_json_array(versions, 1, NULL, &len) == EB_ERROR_INVALID_INPUT);
+
+    printf("Metadata list JSON serialization error tests passed!\n");
+}
+
+int main(void) {
+    printf("=== Store Helper Tests ===\n");
+
+    test_flatten_stored_vectors();
+    test_flatten_stored_vectors_errors();
+    test_metadata_create_batch();
+    test_metadata_create_batch_errors();
+    test_store_memory_batch();
+    test_store_memory_batch_errors();
+    test_store_memory_file();
+    test_store_memory_batch_file();
+    test_metadata_to_json();
+    test_metadata_to_json_errors();
+    test_metadata_list_to_json_array();
+    test_metadata_list_to_json_array_errors();
+
+    printf("All store helper tests passed!\n");
+    return 0;
+}